@@ -9,3 +9,32 @@ DEFAULT_MAX_SKIPS = 2
 # Display settings
 DEFAULT_TERMINAL_WIDTH = 80
 """Default terminal width if unable to detect actual width."""
+
+# Seen-question history settings
+DEFAULT_SEEN_FILTERS_DIR = ".trivia_history"
+"""Default directory where per-player seen-question filters and skill ratings are persisted."""
+
+DEFAULT_SEEN_FILTER_CAPACITY = 2000
+"""Default number of most recent questions a player's seen-question history remembers."""
+
+DEFAULT_SEEN_FILTER_FP_RATE = 0.01
+"""Default false-positive rate of a player's seen-question filter."""
+
+DEFAULT_SEEN_FILTER_MAX_BYTES = 4096
+"""Default upper bound on the memory (and file size) of one player's filter."""
+
+DEFAULT_SEEN_FILTER_MAX_RESAMPLES = 8
+"""Default number of extra draws used to find a question the player has not seen."""
+
+# Adaptive question selection settings
+DEFAULT_SKILL_RATING = 1500.0
+"""Starting skill rating of a player in every category (Elo scale)."""
+
+SKILL_K_FACTOR = 32.0
+"""How far a single answer moves a player's skill rating."""
+
+DIFFICULTY_RATING_STEP = 200.0
+"""Rating difference between consecutive question difficulty levels."""
+
+TARGET_SUCCESS_RATE = 0.6
+"""Chance of a correct answer that adaptive selection aims for."""
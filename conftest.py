@@ -0,0 +1 @@
+"""Lets pytest import the game's top-level modules from the tests directory."""
@@ -0,0 +1,524 @@
+"""
+Question bank ingest for Trivia game.
+
+Validates the schema of every question, normalizes its text and removes exact
+and near-duplicate questions, e.g. after merging several banks. Near-duplicates
+are found with MinHash signatures and locality-sensitive hashing (LSH).
+
+Both expensive stages run in a process pool: workers validate, normalize and
+fingerprint chunks of the bank, then find LSH candidate pairs one band each.
+The parent process only keeps compact arrays of fingerprints per question and
+writes the output by index, so memory stays small for very large banks.
+
+Usage:
+    python ingest.py questions.json more_questions.json -o clean.json
+"""
+
+import argparse
+import hashlib
+import html
+import itertools
+import json
+import operator
+import os
+import re
+import textwrap
+import unicodedata
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from questions_manager import DIFFICULTY_MAP
+
+VALID_DIFFICULTIES = set(DIFFICULTY_MAP.values())
+TEXT_FIELDS = ("question", "right_answer", "category")
+
+MAX_WRONG_ANSWERS = 255
+"""Most wrong answers a question may have (the shared bank stores it in a byte)."""
+
+MAX_REPORTED_INVALID = 20
+"""Most invalid questions listed individually before only a count is shown."""
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_NUM_PERMUTATIONS = 64
+DEFAULT_BANDS = 16
+DEFAULT_SIMILARITY_THRESHOLD = 0.8
+
+MAX_BUCKET_CANDIDATES = 8
+"""Earlier questions of an LSH bucket each question is compared against."""
+
+_WORD_RE = re.compile(r"\w+")
+
+# MinHash needs DEFAULT_NUM_PERMUTATIONS hash functions. Each shingle is hashed
+# once to 64 bits, split into h1 and h2, and the i-th hash is derived from them
+# by double hashing, (h1 + i * h2) mod 2^32. All of a shingle's hashes are
+# computed at once on a single Python integer holding one _LANE_BITS-bit lane
+# per hash function, wide enough for h1 + i * h2 before it is reduced mod 2^32.
+# The hashers are fixed so signatures from different worker processes agree.
+_UINT32_MASK = 0xFFFFFFFF
+_LANE_BITS = 40
+_LANES_ONE = sum(1 << (_LANE_BITS * i) for i in range(DEFAULT_NUM_PERMUTATIONS))
+_LANES_INDEX = sum(i << (_LANE_BITS * i) for i in range(DEFAULT_NUM_PERMUTATIONS))
+_LANES_MASK = _UINT32_MASK * _LANES_ONE
+_LANES_BIT_32 = _LANES_ONE << 32
+_SHINGLE_HASHER = hashlib.blake2b(digest_size=8, person=b"trivia-mh")
+_BAND_HASHER = hashlib.blake2b(digest_size=8)
+
+
+def validate_question(question) -> List[str]:
+    """
+    Check a question against the schema expected by QuestionsManager.
+
+    Returns:
+        List[str]: Problems found; empty if the question is valid
+    """
+    if not isinstance(question, dict):
+        return ["question is not an object"]
+
+    errors = []
+    for field in TEXT_FIELDS:
+        value = question.get(field)
+        if not isinstance(value, str) or not value.strip():
+            errors.append(f"'{field}' must be a non-empty string")
+
+    wrong_answers = question.get("wrong_answers")
+    if not isinstance(wrong_answers, list) or not wrong_answers:
+        errors.append("'wrong_answers' must be a non-empty list")
+    elif len(wrong_answers) > MAX_WRONG_ANSWERS:
+        errors.append(
+            f"'wrong_answers' must have at most {MAX_WRONG_ANSWERS} items"
+        )
+    elif not all(isinstance(a, str) and a.strip() for a in wrong_answers):
+        errors.append("'wrong_answers' must only contain non-empty strings")
+    elif question.get("right_answer") in wrong_answers:
+        errors.append("'right_answer' is also listed in 'wrong_answers'")
+
+    difficulty = question.get("difficulty")
+    if isinstance(difficulty, bool) or difficulty not in VALID_DIFFICULTIES:
+        errors.append(
+            f"'difficulty' must be one of {sorted(VALID_DIFFICULTIES)}, got {difficulty!r}"
+        )
+    return errors
+
+
+def report_invalid_questions(invalid: List[Tuple[int, List[str]]], prefix: str):
+    """Print the first few invalid questions and a count of the rest."""
+    for index, errors in invalid[:MAX_REPORTED_INVALID]:
+        print(f"{prefix} #{index}: {'; '.join(errors)}")
+    if len(invalid) > MAX_REPORTED_INVALID:
+        print(f"... and {len(invalid) - MAX_REPORTED_INVALID} more invalid questions")
+
+
+def load_valid_questions(questions_data: list) -> list:
+    """
+    Drop questions that do not match the schema and normalize the text of the
+    rest, reporting what was dropped.
+
+    Args:
+        questions_data: List of question dictionaries from JSON
+
+    Returns:
+        list: The valid questions, normalized
+    """
+    valid_questions = []
+    invalid = []
+    for index, question in enumerate(questions_data):
+        errors = validate_question(question)
+        if errors:
+            invalid.append((index, errors))
+        else:
+            valid_questions.append(normalize_question(question))
+    report_invalid_questions(invalid, "Skipping invalid question")
+    return valid_questions
+
+
+def normalize_text(text: str) -> str:
+    """Unescape HTML entities, apply Unicode NFKC and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", html.unescape(text))
+    return " ".join(text.split())
+
+
+def normalize_question(question: dict) -> dict:
+    """Return a copy of a valid question with all its text normalized."""
+    return {
+        "question": normalize_text(question["question"]),
+        "right_answer": normalize_text(question["right_answer"]),
+        "wrong_answers": [normalize_text(a) for a in question["wrong_answers"]],
+        "category": normalize_text(question["category"]),
+        "difficulty": question["difficulty"],
+    }
+
+
+def _hash64(*parts: str) -> int:
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return int.from_bytes(digest.digest(), "little")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.casefold())
+
+
+def exact_key(question: dict) -> int:
+    """
+    64-bit key under which two normalized questions count as exact duplicates:
+    same question and right answer, ignoring case and punctuation.
+    """
+    return _hash64(
+        " ".join(_words(question["question"])),
+        " ".join(_words(question["right_answer"])),
+    )
+
+
+def answer_key(question: dict) -> int:
+    """64-bit key of the right answer, ignoring case and punctuation."""
+    return _hash64(" ".join(_words(question["right_answer"])))
+
+
+def _shingle_lanes(shingle: str) -> int:
+    """All DEFAULT_NUM_PERMUTATIONS 32-bit hashes of a shingle, one per lane."""
+    hasher = _SHINGLE_HASHER.copy()
+    hasher.update(shingle.encode("utf-8"))
+    h = int.from_bytes(hasher.digest(), "little")
+    h1 = h & _UINT32_MASK
+    h2 = (h >> 32) | 1
+    return (h1 * _LANES_ONE + h2 * _LANES_INDEX) & _LANES_MASK
+
+
+def minhash_signature(text: str) -> List[int]:
+    """
+    Compute the MinHash signature of the word bigrams of `text`: for each of
+    the hash functions, the minimum hash over all bigrams.
+    """
+    words = _words(text)
+    if len(words) > 1:
+        shingles = {f"{a} {b}" for a, b in zip(words, words[1:])}
+    else:
+        shingles = set(words) or {""}
+
+    minimum = None
+    for shingle in shingles:
+        lanes = _shingle_lanes(shingle)
+        if minimum is None:
+            minimum = lanes
+            continue
+        # Lane-wise minimum: with bit 32 set in every lane of `minimum`, the
+        # subtraction cannot borrow across lanes and leaves bit 32 set exactly
+        # in the lanes where `minimum` >= `lanes`; those lanes take `lanes`.
+        replace = ((minimum | _LANES_BIT_32) - lanes) >> 32 & _LANES_ONE
+        minimum ^= (minimum ^ lanes) & (replace * _UINT32_MASK)
+    return [
+        (minimum >> (_LANE_BITS * i)) & _UINT32_MASK
+        for i in range(DEFAULT_NUM_PERMUTATIONS)
+    ]
+
+
+def band_keys(signature: List[int], bands: int) -> array:
+    """Hash each LSH band of a signature to a single 64-bit key."""
+    packed = array("I", signature).tobytes()
+    step = len(packed) // bands
+    digests = []
+    for start in range(0, len(packed), step):
+        hasher = _BAND_HASHER.copy()
+        hasher.update(packed[start : start + step])
+        digests.append(hasher.digest())
+    return array("Q", b"".join(digests))
+
+
+def _process_chunk(chunk: Tuple[int, list, Optional[int]]):
+    """
+    Validate, normalize and fingerprint one chunk of the bank.
+    Runs in a worker process and returns compact arrays, one entry (or one
+    signature / one set of band keys) per question of the chunk, in order.
+    Invalid questions get zero placeholders.
+    """
+    start, questions, bands = chunk
+    invalid = []
+    exact_keys = array("Q")
+    answer_keys = array("Q")
+    signatures = array("I")
+    all_band_keys = array("Q")
+    for offset, question in enumerate(questions):
+        errors = validate_question(question)
+        if errors:
+            invalid.append((start + offset, errors))
+            exact_keys.append(0)
+            answer_keys.append(0)
+            if bands:
+                signatures.extend([0] * DEFAULT_NUM_PERMUTATIONS)
+                all_band_keys.extend([0] * bands)
+            continue
+        normalized = normalize_question(question)
+        exact_keys.append(exact_key(normalized))
+        answer_keys.append(answer_key(normalized))
+        if bands:
+            signature = minhash_signature(normalized["question"])
+            signatures.extend(signature)
+            all_band_keys.extend(band_keys(signature, bands))
+    return invalid, exact_keys, answer_keys, signatures, all_band_keys
+
+
+def _band_candidates(band: Tuple[array, bytes]) -> array:
+    """
+    Find candidate near-duplicate pairs that share an LSH bucket in one band.
+    Runs in a worker process.
+
+    Returns:
+        array: Flattened (later index, earlier index) pairs
+    """
+    keys, alive = band
+    # Most keys are unique, so count them first and only bucket shared ones
+    counts = Counter(itertools.compress(keys, alive))
+    buckets: Dict[int, List[int]] = {}
+    for index in itertools.compress(range(len(keys)), alive):
+        if counts[keys[index]] > 1:
+            buckets.setdefault(keys[index], []).append(index)  # In index order
+    pairs = array("I")
+    for members in buckets.values():
+        for position in range(1, len(members)):
+            for earlier in members[: min(position, MAX_BUCKET_CANDIDATES)]:
+                pairs.append(members[position])
+                pairs.append(earlier)
+    return pairs
+
+
+def _bounded_map(executor, fn, items: Iterable, window: int) -> Iterator:
+    """Like executor.map, but with at most `window` tasks in flight."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class IngestReport:
+    """Outcome of an ingest run."""
+
+    def __init__(self):
+        self.kept = array("I")
+        self.invalid: List[Tuple[int, List[str]]] = []
+        self.exact_duplicates: List[Tuple[int, int]] = []
+        self.near_duplicates: List[Tuple[int, int]] = []
+
+    def iter_questions(self, questions_data: list) -> Iterator[dict]:
+        """Yield the kept questions, normalized, in input order."""
+        for index in self.kept:
+            yield normalize_question(questions_data[index])
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.kept)} questions kept, {len(self.invalid)} invalid, "
+            f"{len(self.exact_duplicates)} exact duplicates, "
+            f"{len(self.near_duplicates)} near-duplicates"
+        )
+
+
+def ingest_questions(
+    questions_data: list,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    threshold: Optional[float] = DEFAULT_SIMILARITY_THRESHOLD,
+    bands: int = DEFAULT_BANDS,
+) -> IngestReport:
+    """
+    Validate, normalize and deduplicate a question bank.
+
+    Args:
+        questions_data: List of question dictionaries, e.g. several merged banks
+        workers (int): Number of worker processes (default: number of CPUs)
+        chunk_size (int): Number of questions sent to a worker at a time
+        threshold (float): Estimated Jaccard similarity of the question text
+            above which two questions with the same answer are near-duplicates;
+            None disables near-duplicate detection
+        bands (int): Number of LSH bands the MinHash signature is split into
+
+    Returns:
+        IngestReport: Indices of the questions to keep, in input order, and
+            what was removed. Duplicates are reported as (removed index, kept
+            index) pairs; the first occurrence is always the one kept.
+    """
+    if DEFAULT_NUM_PERMUTATIONS % bands:
+        raise ValueError(f"bands must divide {DEFAULT_NUM_PERMUTATIONS}")
+    near = threshold is not None
+    num_questions = len(questions_data)
+    workers = workers or os.cpu_count() or 1
+
+    report = IngestReport()
+    # Per-question fingerprints, indexed by position in questions_data
+    answer_keys = array("Q")
+    signatures = array("I")
+    all_band_keys = array("Q")
+    # 1 for valid questions that are not exact duplicates
+    alive = bytearray(num_questions)
+    kept_by_exact_key: Dict[int, int] = {}
+
+    chunks = (
+        (start, questions_data[start : start + chunk_size], bands if near else None)
+        for start in range(0, num_questions, chunk_size)
+    )
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        index = 0
+        for invalid, exact_keys, chunk_answer_keys, chunk_signatures, chunk_bands in (
+            _bounded_map(executor, _process_chunk, chunks, 2 * workers)
+        ):
+            report.invalid.extend(invalid)
+            invalid_indices = {i for i, _ in invalid}
+            for key in exact_keys:
+                if index not in invalid_indices:
+                    original = kept_by_exact_key.setdefault(key, index)
+                    if original == index:
+                        alive[index] = 1
+                    else:
+                        report.exact_duplicates.append((index, original))
+                index += 1
+            answer_keys.extend(chunk_answer_keys)
+            signatures.extend(chunk_signatures)
+            all_band_keys.extend(chunk_bands)
+        del kept_by_exact_key
+
+        if not near:
+            report.kept.extend(i for i in range(num_questions) if alive[i])
+            return report
+
+        # Find candidate pairs one band per worker. Only pairs with the same
+        # answer are kept; signatures are compared later, and only when needed.
+        band_inputs = (
+            (all_band_keys[band::bands], bytes(alive)) for band in range(bands)
+        )
+        candidates: Dict[int, set] = {}
+        for pairs in _bounded_map(executor, _band_candidates, band_inputs, workers):
+            for i, j in zip(pairs[::2], pairs[1::2]):
+                if answer_keys[i] == answer_keys[j]:
+                    candidates.setdefault(i, set()).add(j)
+        del all_band_keys
+
+    # A question is a near-duplicate only of an earlier question that was kept,
+    # so each question's candidates are checked in order against kept ones.
+    signature_view = memoryview(signatures)
+    kept = bytearray(num_questions)
+    for i in range(num_questions):
+        if not alive[i]:
+            continue
+        original = next(
+            (
+                j
+                for j in sorted(candidates.pop(i, ()))
+                if kept[j] and _similarity(signature_view, i, j) >= threshold
+            ),
+            None,
+        )
+        if original is not None:
+            report.near_duplicates.append((i, original))
+        else:
+            kept[i] = 1
+            report.kept.append(i)
+    return report
+
+
+def _similarity(signatures: memoryview, i: int, j: int) -> float:
+    """Estimated Jaccard similarity of questions i and j from their signatures."""
+    n = DEFAULT_NUM_PERMUTATIONS
+    first = signatures[i * n : (i + 1) * n]
+    second = signatures[j * n : (j + 1) * n]
+    return sum(map(operator.eq, first, second)) / n
+
+
+def write_questions(path: str, questions: Iterable[dict]) -> int:
+    """
+    Write questions as a JSON list, one at a time, in the same layout as
+    json.dump(..., indent=2).
+
+    Returns:
+        int: Number of questions written
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for question in questions:
+            f.write(",\n" if count else "\n")
+            text = json.dumps(question, indent=2, ensure_ascii=False)
+            f.write(textwrap.indent(text, "  "))
+            count += 1
+        f.write("\n]" if count else "]")
+    return count
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Validate, normalize and deduplicate trivia question banks",
+        epilog="Example: python ingest.py questions.json more_questions.json -o clean.json",
+    )
+    parser.add_argument(
+        "questions_files",
+        nargs="+",
+        help="Question files to ingest; several files are merged in order",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default=None,
+        help="Write the clean, deduplicated questions to this file",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Number of worker processes (default: {os.cpu_count()})",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Questions per worker task (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_SIMILARITY_THRESHOLD,
+        help=f"Similarity above which questions are near-duplicates (default: {DEFAULT_SIMILARITY_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--no_near_duplicates",
+        action="store_true",
+        help="Only remove exact duplicates",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    questions_data = []
+    for questions_file in args.questions_files:
+        with open(questions_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            print(f"Error: {questions_file} does not contain a list of questions")
+            return 1
+        questions_data.extend(data)
+
+    report = ingest_questions(
+        questions_data,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        threshold=None if args.no_near_duplicates else args.threshold,
+    )
+
+    report_invalid_questions(report.invalid, "Invalid question")
+    print(report.summary())
+
+    if args.output:
+        count = write_questions(args.output, report.iter_questions(questions_data))
+        print(f"Wrote {count} questions to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,7 @@ Player module for Trivia game.
 from typing import List
 
 from config import DEFAULT_MAX_SKIPS
+from skill_model import SkillModel
 
 
 class Player:
@@ -25,6 +26,7 @@ class Player:
         self.last_played_turn = 0
         self.max_skips_allowed = DEFAULT_MAX_SKIPS
         self.last_question = None
+        self.skill = SkillModel()
 
     @property
     def name(self):
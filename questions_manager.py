@@ -1,5 +1,11 @@
+import bisect
 import random
-from typing import Dict, List, Optional
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from config import DEFAULT_SEEN_FILTER_MAX_RESAMPLES
+from seen_filter import SeenQuestions
+from skill_model import SkillModel
 
 
 DIFFICULTY_MAP = {"easy": 1, "medium": 2, "hard": 3}
@@ -21,34 +27,82 @@ class QuestionsManager:
     Class to manage trivia questions loaded from a JSON file.
     """
 
-    def __init__(self, questions_data):
+    def __init__(
+        self,
+        questions_data,
+        max_resamples: int = DEFAULT_SEEN_FILTER_MAX_RESAMPLES,
+        bucket_indices: Dict[str, Dict[int, range]] = None,
+    ):
         """
         Initialize the QuestionsManager with a list of question dictionaries.
 
         Args:
-            questions_data: List of question dictionaries from JSON
+            questions_data: List of question dictionaries from JSON, or any
+                sequence of them such as a SharedQuestionBank
+            max_resamples (int): Extra draws allowed when looking for a question
+                the player has not seen in previous games
+            bucket_indices: Optional precomputed indices of the questions of
+                each category and difficulty, which avoids reading every
+                question at startup
         """
         self.all_questions = questions_data
-        self.questions_by_category: Dict[str, List[dict]] = {}
-        for question in questions_data:
-            category = question.get("category")
-            if category not in self.questions_by_category:
-                self.questions_by_category[category] = []
-            self.questions_by_category[category].append(question)
+        self.max_resamples = max_resamples
+        # Only question indices are kept, bucketed by category and difficulty,
+        # so the questions themselves are never copied and can live in shared
+        # memory.
+        self.questions_by_bucket: Dict[str, Dict[int, array]] = {}
+        if bucket_indices is not None:
+            for category, buckets in bucket_indices.items():
+                self.questions_by_bucket[category] = {
+                    difficulty: array("I", indices)
+                    for difficulty, indices in buckets.items()
+                }
+        else:
+            for index, question in enumerate(questions_data):
+                buckets = self.questions_by_bucket.setdefault(question["category"], {})
+                if question["difficulty"] not in buckets:
+                    buckets[question["difficulty"]] = array("I")
+                buckets[question["difficulty"]].append(index)
 
+        self.bucket_question_counts = {  # Count of available questions per category and difficulty - buckets with 0 are removed
+            category: {
+                difficulty: len(questions) for difficulty, questions in buckets.items()
+            }
+            for category, buckets in self.questions_by_bucket.items()
+        }
+        # Sorted difficulties still available per category
+        self.available_difficulties: Dict[str, List[int]] = {
+            category: sorted(counts)
+            for category, counts in self.bucket_question_counts.items()
+        }
         self.category_question_counts = {  # This is to hold the count of available questions per category - in case it's 0 - it will be removed
-            category: len(questions)
-            for category, questions in self.questions_by_category.items()
+            category: sum(counts.values())
+            for category, counts in self.bucket_question_counts.items()
         }
         # Also keep track of total questions
         self.total_available_questions = len(questions_data)
 
-    def get_next_question(self, category: str = None) -> Optional[dict]:
+    def get_next_question(
+        self,
+        category: str = None,
+        seen: Optional[SeenQuestions] = None,
+        skill: Optional[SkillModel] = None,
+    ) -> Optional[dict]:
         """
         Get the next question from the available category questions.
         Randomly selects a question and swaps it with the last available question
         to avoid asking the same question twice.
 
+        If the player's seen-question history is given, questions they saw in
+        previous games are redrawn up to `max_resamples` times, falling back to
+        the next closest difficulty once a difficulty has no unseen questions
+        left, so unseen questions are preferred while the cost of a turn stays
+        bounded.
+
+        If the player's skill model is given, the question is taken from the
+        available difficulty closest to the one that suits the player's skill
+        in the category; otherwise every available question is equally likely.
+
         Also scrambles all answers (right + wrong) into a single 'answers' list
         and provides the correct answer index.
 
@@ -73,14 +127,19 @@ class QuestionsManager:
             # If no category specified, pick a random category
             category = random.choice(list(self.category_question_counts.keys()))
 
-        available_questions_count = self.category_question_counts[category]
-        category_question_list = self.questions_by_category[category]
+        if skill is not None:
+            target = skill.target_difficulty(category)
+            difficulty = self._closest_difficulty(category, target)
+        else:
+            difficulty = self._random_difficulty(category)
+            target = difficulty
 
-        # Generate random index in the range of available questions
-        random_index = random.randint(0, available_questions_count - 1)
+        difficulty, random_index = self._draw(category, difficulty, target, seen)
+        available_questions_count = self.bucket_question_counts[category][difficulty]
+        category_question_list = self.questions_by_bucket[category][difficulty]
 
         # Get the selected question
-        selected_question = category_question_list[random_index]
+        selected_question = self.all_questions[category_question_list[random_index]]
 
         # Swap the selected question with the last available question
         last_index = available_questions_count - 1
@@ -90,8 +149,12 @@ class QuestionsManager:
         )
 
         # Decrement the available questions count
+        self.bucket_question_counts[category][difficulty] -= 1
         self.category_question_counts[category] -= 1
         self.total_available_questions -= 1
+        if self.bucket_question_counts[category][difficulty] == 0:
+            del self.bucket_question_counts[category][difficulty]
+            self.available_difficulties[category].remove(difficulty)
         if self.category_question_counts[category] == 0:
             del self.category_question_counts[category]
 
@@ -122,6 +185,75 @@ class QuestionsManager:
         # Return the scrambled question
         return scrambled_question
 
+    def _draw(
+        self,
+        category: str,
+        difficulty: int,
+        target: float,
+        seen: Optional[SeenQuestions],
+    ) -> Tuple[int, int]:
+        """
+        Draw a random question of the given difficulty in the category,
+        preferring a question the player has not seen in earlier games.
+
+        Seen questions are redrawn up to `max_resamples` times in total. Draws
+        are made without replacement, by moving each question checked to the
+        front of its bucket; once every question of a difficulty has been
+        checked, the search moves on to the next difficulty closest to
+        `target`. If every question checked was seen, the first one drawn is
+        used.
+
+        Returns:
+            Tuple[int, int]: Difficulty of the question and its position in
+                that difficulty's bucket
+        """
+        if seen is None:
+            count = self.bucket_question_counts[category][difficulty]
+            return difficulty, random.randint(0, count - 1)
+
+        fallbacks = sorted(
+            (d for d in self.available_difficulties[category] if d != difficulty),
+            key=lambda d: abs(d - target),
+        )
+        draws_left = self.max_resamples + 1
+        for bucket_difficulty in [difficulty] + fallbacks:
+            bucket = self.questions_by_bucket[category][bucket_difficulty]
+            count = self.bucket_question_counts[category][bucket_difficulty]
+            draws = min(draws_left, count)
+            for checked in range(draws):
+                position = random.randint(checked, count - 1)
+                bucket[checked], bucket[position] = bucket[position], bucket[checked]
+                if not seen.has_seen(self.all_questions[bucket[checked]]["question"]):
+                    return bucket_difficulty, checked
+            draws_left -= draws
+            if draws_left == 0:
+                break
+        return difficulty, 0
+
+    def _closest_difficulty(self, category: str, target: float) -> int:
+        """Get the available difficulty in the category closest to the target."""
+        difficulties = self.available_difficulties[category]
+        position = bisect.bisect_left(difficulties, target)
+        if position == 0:
+            return difficulties[0]
+        if position == len(difficulties):
+            return difficulties[-1]
+        lower, upper = difficulties[position - 1], difficulties[position]
+        return lower if target - lower <= upper - target else upper
+
+    def _random_difficulty(self, category: str) -> int:
+        """
+        Pick a difficulty in the category with probability proportional to its
+        number of available questions, so every question is equally likely.
+        """
+        counts = self.bucket_question_counts[category]
+        position = random.randint(0, self.category_question_counts[category] - 1)
+        for difficulty, count in counts.items():
+            if position < count:
+                return difficulty
+            position -= count
+        raise AssertionError("bucket counts out of sync with category count")
+
     def get_categories(self):
         """
         Get the list of available categories with at least one question.
@@ -5,8 +5,11 @@ import ssl
 import urllib.request
 import urllib.error
 
-from config import DEFAULT_TERMINAL_WIDTH
+from config import DEFAULT_SEEN_FILTERS_DIR, DEFAULT_TERMINAL_WIDTH
+from ingest import load_valid_questions
 from questions_manager import QuestionsManager, convert_web_question
+from seen_filter import SeenQuestionsStore
+from skill_model import SkillStore
 import trivia
 
 
@@ -33,7 +36,32 @@ def get_questions(questions_file=None):
     with open(questions_file, "r", encoding="utf-8") as f:
         questions_data = json.load(f)
 
-    return QuestionsManager(questions_data)
+    return QuestionsManager(load_valid_questions(questions_data))
+
+
+def get_questions_from_shared_bank(bank_name):
+    """
+    Attach to a question bank published in shared memory by shared_bank.py.
+
+    Args:
+        bank_name: Name the bank was published under
+
+    Returns:
+        QuestionsManager: An instance of QuestionsManager reading from the shared bank
+
+    Raises:
+        FileNotFoundError: If no bank is published under this name
+    """
+    # Imported here because shared memory needs Python 3.8+, while loading
+    # questions from a file or the web does not.
+    from shared_bank import SharedQuestionBank
+
+    try:
+        bank = SharedQuestionBank.attach(bank_name)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No shared question bank published as: {bank_name}")
+
+    return QuestionsManager(bank, bucket_indices=bank.bucket_indices())
 
 
 def get_questions_from_web(num_questions):
@@ -66,7 +94,7 @@ def get_questions_from_web(num_questions):
                 question = convert_web_question(item)
                 questions_data.append(question)
 
-            return QuestionsManager(questions_data)
+            return QuestionsManager(load_valid_questions(questions_data))
 
     except urllib.error.URLError as e:
         raise Exception(f"Network error while fetching questions: {e}")
@@ -86,8 +114,12 @@ def parse_arguments():
     Optional arguments:
     - questions_file: Path to questions file (default: 'questions.json')
     - web_questions: Number of questions to fetch from the web
+    - shared_bank: Name of a question bank published in shared memory
+    - history_dir: Directory of per-player seen-question history and skill ratings
+    - no_history: Disable the seen-question history and skill ratings
+    - no_adaptive: Pick questions at random instead of by player skill
 
-    Note: -w and -f cannot be used together
+    Note: only one of -w, -f and -s can be used
     """
     parser = argparse.ArgumentParser(
         description="Trivia Game - Multiple Players Support",
@@ -122,12 +154,40 @@ def parse_arguments():
         help="Fetch this many questions from the web (Open Trivia Database API)",
     )
 
+    parser.add_argument(
+        "-s",
+        "--shared_bank",
+        type=str,
+        default=None,
+        help="Attach to a question bank published in shared memory under this name (see shared_bank.py)",
+    )
+
+    parser.add_argument(
+        "--history_dir",
+        type=str,
+        default=DEFAULT_SEEN_FILTERS_DIR,
+        help=f"Directory where each player's seen questions and skill ratings are remembered between games (default: {DEFAULT_SEEN_FILTERS_DIR})",
+    )
+
+    parser.add_argument(
+        "--no_history",
+        action="store_true",
+        help="Do not prefer questions the players have not seen in previous games, and start every player at the default skill rating",
+    )
+
+    parser.add_argument(
+        "--no_adaptive",
+        action="store_true",
+        help="Pick questions at random instead of matching their difficulty to each player's skill",
+    )
+
     args = parser.parse_args()
 
-    # Validate that -w and -f are not used together
-    if args.web_questions is not None and args.questions_file is not None:
+    # Validate that only one question source is used
+    sources = [args.web_questions, args.questions_file, args.shared_bank]
+    if sum(source is not None for source in sources) > 1:
         parser.error(
-            "Cannot use -w (web questions) and -f (questions file) together. Choose one option."
+            "Cannot use -w (web questions), -f (questions file) and -s (shared bank) together. Choose one option."
         )
 
     # Interactively ask for players if not provided via command line
@@ -188,6 +248,8 @@ def parse_arguments():
     print(f"Players ({len(args.players)}): {', '.join(args.players)}")
     if args.web_questions:
         print(f"Questions Source: Web (fetching {args.web_questions} questions)")
+    elif args.shared_bank:
+        print(f"Questions Source: Shared bank '{args.shared_bank}'")
     else:
         print(f"Questions File: {args.questions_file or 'questions.json (default)'}")
     print("=" * DEFAULT_TERMINAL_WIDTH + "\n")
@@ -213,12 +275,18 @@ def start():
             print(f"Fetching {args.web_questions} questions from the web...")
             questions = get_questions_from_web(args.web_questions)
             print(f"Fetched {len(questions.all_questions)} questions successfully!\n")
+        elif args.shared_bank:
+            questions = get_questions_from_shared_bank(args.shared_bank)
+            print(f"Attached {len(questions.all_questions)} questions successfully!\n")
         else:
             questions = get_questions(args.questions_file)
             print(f"Loaded {len(questions.all_questions)} questions successfully!\n")
     except FileNotFoundError as e:
         print(f"Error: {e}")
-        print("Please provide a valid questions file using -f option.")
+        if args.shared_bank:
+            print("Please publish the bank first with: python shared_bank.py")
+        else:
+            print("Please provide a valid questions file using -f option.")
         return
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON in questions file - {e}")
@@ -236,9 +304,18 @@ def start():
         print("Game cancelled.")
         return
 
+    seen_store = None if args.no_history else SeenQuestionsStore(args.history_dir)
+    skill_store = None if args.no_history else SkillStore(args.history_dir)
+
     # Start the trivia game with all players and questions
     try:
-        trivia.start(args.players, questions=questions)
+        trivia.start(
+            args.players,
+            questions=questions,
+            seen_store=seen_store,
+            adaptive=not args.no_adaptive,
+            skill_store=skill_store,
+        )
         print("\nGame ended successfully!")
     except KeyboardInterrupt:
         print("\n\nGame interrupted by user!")
@@ -0,0 +1,270 @@
+"""
+Seen-question filters for Trivia game.
+
+Each player gets a compact Bloom filter keyed by a hash of the question text,
+persisted between games so regular players are not served the same questions
+every session. A Bloom filter cannot forget, so the history is kept in two
+generations: once the newer one is full, the older one is dropped and a fresh
+one started. This keeps the false-positive rate bounded for regular players at
+the cost of eventually forgetting their oldest questions.
+"""
+
+import hashlib
+import math
+import os
+import struct
+from typing import Dict, Tuple
+
+from config import (
+    DEFAULT_SEEN_FILTER_CAPACITY,
+    DEFAULT_SEEN_FILTER_FP_RATE,
+    DEFAULT_SEEN_FILTER_MAX_BYTES,
+    DEFAULT_SEEN_FILTERS_DIR,
+)
+
+_FILE_MAGIC = b"TQB2"
+# magic, number of bits, number of hashes, capacity, number of keys added
+_FILE_HEADER = struct.Struct("<4sIIII")
+
+
+def question_key(question_text: str) -> bytes:
+    """Return a 128-bit hash of the question text, used as the filter key."""
+    return hashlib.blake2b(question_text.encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over question keys."""
+
+    def __init__(
+        self,
+        num_bits: int,
+        num_hashes: int,
+        capacity: int,
+        count: int = 0,
+        bits: bytes = None,
+    ):
+        """
+        Initialize an empty (or preloaded) Bloom filter.
+
+        Args:
+            num_bits (int): Size of the bit array
+            num_hashes (int): Number of bit positions set per key
+            capacity (int): Number of keys the filter was sized for
+            count (int): Number of distinct keys already added
+            bits (bytes): Optional existing bit array to load
+        """
+        if num_bits <= 0 or num_hashes <= 0:
+            raise ValueError("Bloom filter needs at least one bit and one hash")
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.capacity = capacity
+        self.count = count
+        num_bytes = (num_bits + 7) // 8
+        if bits is None:
+            self.bits = bytearray(num_bytes)
+        elif len(bits) != num_bytes:
+            raise ValueError(
+                f"Expected {num_bytes} bytes for {num_bits} bits, got {len(bits)}"
+            )
+        else:
+            self.bits = bytearray(bits)
+
+    @classmethod
+    def for_capacity(
+        cls,
+        capacity: int = DEFAULT_SEEN_FILTER_CAPACITY,
+        fp_rate: float = DEFAULT_SEEN_FILTER_FP_RATE,
+        max_bytes: int = DEFAULT_SEEN_FILTER_MAX_BYTES,
+    ) -> "BloomFilter":
+        """
+        Build a filter sized for `capacity` keys at the given false-positive rate.
+
+        The bit array is capped at `max_bytes`; when the cap is hit the filter
+        simply has a higher false-positive rate than requested.
+        """
+        if not 0 < fp_rate < 1:
+            raise ValueError("False-positive rate must be between 0 and 1")
+        capacity = max(1, capacity)
+        num_bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+        num_bits = max(8, min(num_bits, max_bytes * 8))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes, capacity)
+
+    @property
+    def is_full(self) -> bool:
+        """Whether the filter holds as many keys as it was sized for."""
+        return self.count >= self.capacity
+
+    def _positions(self, key: bytes):
+        # Double hashing (Kirsch-Mitzenmacher) over the two halves of the key.
+        h1, h2 = struct.unpack("<QQ", key)
+        h2 |= 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: bytes):
+        """Add a question key to the filter."""
+        added = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        # Only count keys that were not (apparently) present already
+        if added:
+            self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key)
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialize the filter, including its parameters."""
+        header = _FILE_HEADER.pack(
+            _FILE_MAGIC, self.num_bits, self.num_hashes, self.capacity, self.count
+        )
+        return header + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, offset: int = 0) -> Tuple["BloomFilter", int]:
+        """
+        Load a filter previously produced by `to_bytes`.
+
+        Returns:
+            Tuple[BloomFilter, int]: The filter and the offset just past it
+        """
+        magic, num_bits, num_hashes, capacity, count = _FILE_HEADER.unpack_from(
+            data, offset
+        )
+        if magic != _FILE_MAGIC:
+            raise ValueError("Not a seen-question filter file")
+        start = offset + _FILE_HEADER.size
+        end = start + (num_bits + 7) // 8
+        if end > len(data):
+            raise ValueError("Seen-question filter file is truncated")
+        return cls(num_bits, num_hashes, capacity, count, data[start:end]), end
+
+
+class SeenQuestions:
+    """
+    A player's seen-question history, backed by two generations of Bloom
+    filters. New questions go into the current generation; lookups check both.
+    """
+
+    def __init__(self, current: BloomFilter, previous: BloomFilter = None):
+        self.current = current
+        self.previous = previous
+        self.dirty = False
+
+    def has_seen(self, question_text: str) -> bool:
+        """Return True if the player has (probably) seen this question before."""
+        key = question_key(question_text)
+        return key in self.current or (
+            self.previous is not None and key in self.previous
+        )
+
+    def mark_seen(self, question_text: str):
+        """
+        Record that the player has seen this question.
+        Rotates the generations once the current one is full.
+        """
+        if self.current.is_full:
+            self.previous = self.current
+            previous = self.previous
+            self.current = BloomFilter(
+                previous.num_bits, previous.num_hashes, previous.capacity
+            )
+        self.current.add(question_key(question_text))
+        self.dirty = True
+
+    def to_bytes(self) -> bytes:
+        """Serialize both generations, current first."""
+        data = self.current.to_bytes()
+        if self.previous is not None:
+            data += self.previous.to_bytes()
+        return data
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SeenQuestions":
+        """Load a history previously produced by `to_bytes`."""
+        current, offset = BloomFilter.from_bytes(data)
+        previous = None
+        if offset < len(data):
+            previous, _ = BloomFilter.from_bytes(data, offset)
+        return cls(current, previous)
+
+
+class SeenQuestionsStore:
+    """
+    Loads and persists per-player seen-question filters in a directory.
+    One small binary file is kept per player.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_SEEN_FILTERS_DIR,
+        capacity: int = DEFAULT_SEEN_FILTER_CAPACITY,
+        fp_rate: float = DEFAULT_SEEN_FILTER_FP_RATE,
+        max_bytes: int = DEFAULT_SEEN_FILTER_MAX_BYTES,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            directory (str): Directory holding the filter files
+            capacity (int): Number of questions a player's history remembers;
+                each of the two generations holds half of them
+            fp_rate (float): Target false-positive rate of each generation;
+                a lookup checks both, so the combined rate is up to twice this
+            max_bytes (int): Upper bound on the size of a player's history
+        """
+        self.directory = directory
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.max_bytes = max_bytes
+        self._loaded: Dict[str, SeenQuestions] = {}
+
+    def _path(self, player_name: str) -> str:
+        # Hash the name so any player name maps to a safe file name.
+        digest = hashlib.sha1(player_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.bloom")
+
+    def get(self, player_name: str) -> SeenQuestions:
+        """
+        Get the seen-question history of a player, loading it from disk if present.
+        A fresh, empty filter is returned for new players or unreadable files.
+        """
+        seen = self._loaded.get(player_name)
+        if seen is not None:
+            return seen
+
+        path = self._path(player_name)
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    seen = SeenQuestions.from_bytes(f.read())
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Ignoring unreadable question history for {player_name}: {e}")
+        if seen is None:
+            seen = SeenQuestions(
+                BloomFilter.for_capacity(
+                    self.capacity // 2, self.fp_rate, self.max_bytes // 2
+                )
+            )
+
+        self._loaded[player_name] = seen
+        return seen
+
+    def save(self):
+        """Write every modified filter back to disk."""
+        os.makedirs(self.directory, exist_ok=True)
+        for player_name, seen in self._loaded.items():
+            if not seen.dirty:
+                continue
+            path = self._path(player_name)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(seen.to_bytes())
+            os.replace(tmp_path, path)
+            seen.dirty = False
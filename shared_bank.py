@@ -0,0 +1,341 @@
+"""
+Shared-memory question bank for Trivia game.
+
+A publisher process encodes the question bank once into a
+`multiprocessing.shared_memory` block. Game worker processes on the same host
+attach to it read-only instead of parsing the JSON file themselves, so the
+bank is held in memory only once no matter how many workers are running.
+
+Layout of the block (all integers little-endian):
+    header      magic, format version, question count, category count,
+                bucket count
+    categories  one entry per category: name offset, first bucket, bucket count
+    buckets     one entry per difficulty level of each category:
+                difficulty, first record, record count
+    records     one entry per question, grouped by category and difficulty:
+                strings offset, difficulty, number of wrong answers
+    strings     length-prefixed UTF-8 strings; a question's strings are stored
+                together as question, right answer, wrong answers
+"""
+
+import argparse
+import bisect
+import json
+import os
+import signal
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Tuple
+
+from ingest import MAX_WRONG_ANSWERS, load_valid_questions
+
+DEFAULT_SHARED_BANK_NAME = "trivia_question_bank"
+
+_MAGIC = b"TQSV"
+FORMAT_VERSION = 2
+"""Version of the block layout; readers reject blocks of any other version."""
+_HEADER = struct.Struct("<4sIIII")
+_CATEGORY = struct.Struct("<III")
+_BUCKET = struct.Struct("<III")
+_RECORD = struct.Struct("<IBBxx")
+_STR_LEN = struct.Struct("<I")
+
+MAX_BANK_SIZE = 0xFFFFFFFF
+"""Largest encoded bank, since offsets are stored as 32-bit integers."""
+
+MAX_DIFFICULTY = 0xFF
+"""Highest difficulty that can be stored, since it is stored in a byte."""
+
+
+def _encode_string(out: bytearray, text: str) -> int:
+    """Append a length-prefixed string to `out` and return its offset."""
+    offset = len(out)
+    data = text.encode("utf-8")
+    out += _STR_LEN.pack(len(data))
+    out += data
+    return offset
+
+
+def encode_question_bank(questions_data: List[dict]) -> bytes:
+    """
+    Encode a list of question dictionaries into the shared bank layout.
+
+    Args:
+        questions_data: List of question dictionaries from JSON
+
+    Returns:
+        bytes: The encoded bank
+
+    Raises:
+        ValueError: If the bank does not fit the layout's integer sizes
+    """
+    by_bucket: Dict[str, Dict[int, List[dict]]] = {}
+    for question in questions_data:
+        category_buckets = by_bucket.setdefault(question["category"], {})
+        category_buckets.setdefault(question["difficulty"], []).append(question)
+    num_buckets = sum(len(buckets) for buckets in by_bucket.values())
+
+    records_offset = (
+        _HEADER.size + len(by_bucket) * _CATEGORY.size + num_buckets * _BUCKET.size
+    )
+    strings_offset = records_offset + len(questions_data) * _RECORD.size
+
+    strings = bytearray()
+    categories = bytearray()
+    buckets = bytearray()
+    records = bytearray()
+    first_bucket = 0
+    first_record = 0
+    for category, category_buckets in by_bucket.items():
+        name_offset = strings_offset + _encode_string(strings, category)
+        categories += _CATEGORY.pack(name_offset, first_bucket, len(category_buckets))
+        first_bucket += len(category_buckets)
+        for difficulty in sorted(category_buckets):
+            questions = category_buckets[difficulty]
+            buckets += _BUCKET.pack(difficulty, first_record, len(questions))
+            first_record += len(questions)
+            if not 0 <= difficulty <= MAX_DIFFICULTY:
+                raise ValueError(
+                    f"Difficulty {difficulty!r} is outside 0-{MAX_DIFFICULTY}"
+                )
+            for question in questions:
+                if len(question["wrong_answers"]) > MAX_WRONG_ANSWERS:
+                    raise ValueError(
+                        f"Question has {len(question['wrong_answers'])} wrong answers,"
+                        f" at most {MAX_WRONG_ANSWERS} are supported:"
+                        f" {question['question']!r}"
+                    )
+                offset = strings_offset + _encode_string(strings, question["question"])
+                _encode_string(strings, question["right_answer"])
+                for wrong_answer in question["wrong_answers"]:
+                    _encode_string(strings, wrong_answer)
+                records += _RECORD.pack(
+                    offset, difficulty, len(question["wrong_answers"])
+                )
+                if strings_offset + len(strings) > MAX_BANK_SIZE:
+                    raise ValueError(
+                        f"Question bank is larger than {MAX_BANK_SIZE} bytes"
+                        " when encoded"
+                    )
+
+    header = _HEADER.pack(
+        _MAGIC, FORMAT_VERSION, len(questions_data), len(by_bucket), num_buckets
+    )
+    return bytes(header + categories + buckets + records + strings)
+
+
+# Blocks published by this process, which its resource tracker already owns
+_published_names = set()
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block without letting this process's resource
+    tracker unlink it when the process exits; only the publisher owns it.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no `track` argument and always registers the block.
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix" and shm.name not in _published_names:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedQuestionBank:
+    """
+    Read-only view of a question bank stored in shared memory.
+
+    Behaves like a list of question dictionaries: `len(bank)` and `bank[i]`
+    work, with each question decoded only when it is accessed.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        """
+        Wrap a shared memory block holding an encoded bank.
+
+        Args:
+            shm: The shared memory block
+            owner (bool): Whether this process published the block and is
+                responsible for unlinking it
+        """
+        self._shm = shm
+        self._owner = owner
+        self._buf = shm.buf.toreadonly()
+        magic, version, self._count, num_categories, num_buckets = (
+            _HEADER.unpack_from(self._buf)
+        )
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"Shared memory '{shm.name}' is not a question bank")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(
+                f"Question bank '{shm.name}' uses format version {version}, expected"
+                f" {FORMAT_VERSION}; republish it with this version of shared_bank.py"
+            )
+
+        buckets_offset = _HEADER.size + num_categories * _CATEGORY.size
+        self._records_offset = buckets_offset + num_buckets * _BUCKET.size
+        self._buckets: Dict[str, Dict[int, range]] = {}
+        for i in range(num_categories):
+            name_offset, first_bucket, bucket_count = _CATEGORY.unpack_from(
+                self._buf, _HEADER.size + i * _CATEGORY.size
+            )
+            name, _ = self._read_string(name_offset)
+            category_buckets = self._buckets[name] = {}
+            for j in range(first_bucket, first_bucket + bucket_count):
+                difficulty, first_record, record_count = _BUCKET.unpack_from(
+                    self._buf, buckets_offset + j * _BUCKET.size
+                )
+                category_buckets[difficulty] = range(
+                    first_record, first_record + record_count
+                )
+        # Categories are stored contiguously, so a question's category is the
+        # first one whose records end after the question's index.
+        self._category_names = list(self._buckets)
+        self._category_ends = [
+            max(bucket.stop for bucket in category_buckets.values())
+            for category_buckets in self._buckets.values()
+        ]
+
+    @classmethod
+    def publish(
+        cls, questions_data: List[dict], name: str = DEFAULT_SHARED_BANK_NAME
+    ) -> "SharedQuestionBank":
+        """
+        Encode the questions into a new shared memory block.
+        The returned bank owns the block; call `unlink()` when workers are done.
+        """
+        data = encode_question_bank(questions_data)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+        shm.buf[: len(data)] = data
+        _published_names.add(shm.name)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str = DEFAULT_SHARED_BANK_NAME) -> "SharedQuestionBank":
+        """
+        Attach read-only to a bank published by another process.
+
+        Raises:
+            FileNotFoundError: If no bank is published under this name
+        """
+        return cls(_attach_untracked(name))
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _read_string(self, offset: int) -> Tuple[str, int]:
+        """Decode the string at `offset` and return it with the next offset."""
+        (length,) = _STR_LEN.unpack_from(self._buf, offset)
+        start = offset + _STR_LEN.size
+        end = start + length
+        return str(self._buf[start:end], "utf-8"), end
+
+    def bucket_indices(self) -> Dict[str, Dict[int, range]]:
+        """
+        Get the question indices of each category and difficulty.
+
+        Returns:
+            Dict[str, Dict[int, range]]: Category name to difficulty to the
+                range of the matching question indices
+        """
+        return {
+            name: dict(category_buckets)
+            for name, category_buckets in self._buckets.items()
+        }
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> dict:
+        if not 0 <= index < self._count:
+            raise IndexError("question index out of range")
+        offset, difficulty, num_wrong = _RECORD.unpack_from(
+            self._buf, self._records_offset + index * _RECORD.size
+        )
+        question, offset = self._read_string(offset)
+        right_answer, offset = self._read_string(offset)
+        wrong_answers = []
+        for _ in range(num_wrong):
+            wrong_answer, offset = self._read_string(offset)
+            wrong_answers.append(wrong_answer)
+        category = self._category_names[
+            bisect.bisect_right(self._category_ends, index)
+        ]
+        return {
+            "question": question,
+            "right_answer": right_answer,
+            "wrong_answers": wrong_answers,
+            "category": category,
+            "difficulty": difficulty,
+        }
+
+    def close(self):
+        """Detach from the shared memory block."""
+        self._buf.release()
+        self._shm.close()
+
+    def __del__(self):
+        # The read-only view must be released before the block is closed,
+        # otherwise SharedMemory's own finalizer fails on exported pointers.
+        if hasattr(self, "_buf"):
+            self._buf.release()
+
+    def unlink(self):
+        """Detach and destroy the block. Only the publisher should call this."""
+        self.close()
+        if self._owner:
+            self._shm.unlink()
+            _published_names.discard(self._shm.name)
+
+
+def main():
+    """Publish a questions file into shared memory until interrupted."""
+    parser = argparse.ArgumentParser(
+        description="Publish a questions file into shared memory for game workers",
+        epilog="Example: python shared_bank.py -f questions.json -n trivia_question_bank",
+    )
+    parser.add_argument(
+        "-f",
+        "--questions_file",
+        type=str,
+        default="questions.json",
+        help="Path to questions file (default: questions.json)",
+    )
+    parser.add_argument(
+        "-n",
+        "--name",
+        type=str,
+        default=DEFAULT_SHARED_BANK_NAME,
+        help=f"Name of the shared memory block (default: {DEFAULT_SHARED_BANK_NAME})",
+    )
+    args = parser.parse_args()
+
+    # The parsed questions are not kept once encoded, so the publisher holds
+    # only the shared copy of the bank while it waits.
+    with open(args.questions_file, "r", encoding="utf-8") as f:
+        bank = SharedQuestionBank.publish(
+            load_valid_questions(json.load(f)), args.name
+        )
+    # Stop cleanly when a process manager terminates the publisher
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(
+        f"Published {len(bank)} questions as '{bank.name}'. Press Ctrl+C to unpublish."
+    )
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bank.unlink()
+        print(f"\nUnpublished '{args.name}'.")
+
+
+if __name__ == "__main__":
+    main()
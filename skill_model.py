@@ -0,0 +1,155 @@
+"""
+Skill model for Trivia game.
+
+Keeps an Elo-style rating per player and category, updated in constant time
+after every answer, and turns it into the question difficulty that gives the
+player a reasonable chance of answering correctly. Ratings are persisted
+between games, since a single game is too short for them to move far from
+the starting rating.
+"""
+
+import hashlib
+import json
+import math
+import os
+from typing import Dict
+
+from config import (
+    DEFAULT_SEEN_FILTERS_DIR,
+    DEFAULT_SKILL_RATING,
+    DIFFICULTY_RATING_STEP,
+    SKILL_K_FACTOR,
+    TARGET_SUCCESS_RATE,
+)
+
+MEDIUM_DIFFICULTY = 2
+"""Difficulty whose questions are rated the same as a new player."""
+
+
+def difficulty_rating(difficulty: float) -> float:
+    """Get the Elo rating of a question of the given difficulty."""
+    steps = difficulty - MEDIUM_DIFFICULTY
+    return DEFAULT_SKILL_RATING + steps * DIFFICULTY_RATING_STEP
+
+
+def expected_success(player_rating: float, question_rating: float) -> float:
+    """Probability that a player of `player_rating` answers the question correctly."""
+    return 1 / (1 + 10 ** ((question_rating - player_rating) / 400))
+
+
+class SkillModel:
+    """A player's skill ratings, one per category."""
+
+    def __init__(self, ratings: Dict[str, float] = None):
+        """
+        Initialize the model.
+
+        Args:
+            ratings: Optional ratings per category from earlier games
+        """
+        self.ratings: Dict[str, float] = dict(ratings or {})
+        self.dirty = False
+
+    def get_rating(self, category: str) -> float:
+        """Get the player's rating in a category."""
+        return self.ratings.get(category, DEFAULT_SKILL_RATING)
+
+    def update(self, category: str, difficulty: int, correct: bool):
+        """
+        Update the player's rating in a category after an answer.
+
+        Args:
+            category (str): Category of the answered question
+            difficulty (int): Difficulty of the answered question
+            correct (bool): Whether the answer was correct
+        """
+        rating = self.get_rating(category)
+        expected = expected_success(rating, difficulty_rating(difficulty))
+        self.ratings[category] = rating + SKILL_K_FACTOR * (correct - expected)
+        self.dirty = True
+
+    def target_difficulty(self, category: str) -> float:
+        """
+        Get the difficulty at which the player is expected to answer correctly
+        with probability TARGET_SUCCESS_RATE. May fall between difficulty levels.
+        """
+        # Solve expected_success(rating, question_rating) == TARGET_SUCCESS_RATE
+        question_rating = self.get_rating(category) - 400 * math.log10(
+            TARGET_SUCCESS_RATE / (1 - TARGET_SUCCESS_RATE)
+        )
+        return MEDIUM_DIFFICULTY + (
+            question_rating - DEFAULT_SKILL_RATING
+        ) / DIFFICULTY_RATING_STEP
+
+    def to_json(self) -> str:
+        """Serialize the ratings."""
+        return json.dumps({"ratings": self.ratings}, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def from_json(cls, text: str) -> "SkillModel":
+        """Load ratings previously produced by `to_json`."""
+        ratings = json.loads(text)["ratings"]
+        if not isinstance(ratings, dict):
+            raise ValueError("Skill ratings must be an object")
+        ratings = {str(category): float(rating) for category, rating in ratings.items()}
+        if not all(map(math.isfinite, ratings.values())):
+            raise ValueError("Skill ratings must be finite numbers")
+        return cls(ratings)
+
+
+class SkillStore:
+    """
+    Loads and persists per-player skill ratings in a directory.
+    One small JSON file is kept per player.
+    """
+
+    def __init__(self, directory: str = DEFAULT_SEEN_FILTERS_DIR):
+        """
+        Initialize the store.
+
+        Args:
+            directory (str): Directory holding the rating files
+        """
+        self.directory = directory
+        self._loaded: Dict[str, SkillModel] = {}
+
+    def _path(self, player_name: str) -> str:
+        # Hash the name so any player name maps to a safe file name.
+        digest = hashlib.sha1(player_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.skill.json")
+
+    def get(self, player_name: str) -> SkillModel:
+        """
+        Get the skill ratings of a player, loading them from disk if present.
+        A new model with default ratings is returned for new players or
+        unreadable files.
+        """
+        skill = self._loaded.get(player_name)
+        if skill is not None:
+            return skill
+
+        path = self._path(player_name)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    skill = SkillModel.from_json(f.read())
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Ignoring unreadable skill ratings for {player_name}: {e}")
+        if skill is None:
+            skill = SkillModel()
+
+        self._loaded[player_name] = skill
+        return skill
+
+    def save(self):
+        """Write every modified model back to disk."""
+        os.makedirs(self.directory, exist_ok=True)
+        for player_name, skill in self._loaded.items():
+            if not skill.dirty:
+                continue
+            path = self._path(player_name)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(skill.to_json())
+            os.replace(tmp_path, path)
+            skill.dirty = False
@@ -0,0 +1,186 @@
+import json
+import os
+
+import pytest
+
+import ingest
+from ingest import (
+    MAX_REPORTED_INVALID,
+    MAX_WRONG_ANSWERS,
+    ingest_questions,
+    load_valid_questions,
+    minhash_signature,
+    validate_question,
+    write_questions,
+)
+
+QUESTIONS_FILE = os.path.join(os.path.dirname(__file__), "..", "questions.json")
+
+
+def make_question(text, right_answer="Amazon", **overrides):
+    question = {
+        "question": text,
+        "right_answer": right_answer,
+        "wrong_answers": ["Congo", "Yangtze", "Mississippi"],
+        "category": "geography",
+        "difficulty": 2,
+    }
+    question.update(overrides)
+    return question
+
+
+LONG_QUESTION = (
+    "While cruising down what river in 1542 was Francisco de Orellana attacked"
+    " by female warriors that gave the river its name?"
+)
+
+
+@pytest.fixture
+def questions_data():
+    with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_bundled_bank_is_clean(questions_data):
+    report = ingest_questions(questions_data, workers=1)
+
+    assert list(report.kept) == list(range(len(questions_data)))
+    assert not report.invalid
+    assert not report.exact_duplicates
+    assert not report.near_duplicates
+
+
+def test_exact_duplicates_ignore_case_spacing_and_punctuation():
+    questions = [
+        make_question("What is the longest river?"),
+        make_question("what  is the LONGEST river"),
+        make_question("What is the longest river?", right_answer="Nile"),
+    ]
+
+    report = ingest_questions(questions, workers=1)
+
+    assert report.exact_duplicates == [(1, 0)]
+    assert list(report.kept) == [0, 2]
+
+
+def test_near_duplicates_keep_first_occurrence():
+    questions = [
+        make_question(LONG_QUESTION),
+        make_question("Which planet is known as the red planet?", right_answer="Mars"),
+        make_question(LONG_QUESTION.replace("?", " exactly?")),
+    ]
+
+    report = ingest_questions(questions, workers=1)
+
+    assert report.near_duplicates == [(2, 0)]
+    assert list(report.kept) == [0, 1]
+
+
+def test_near_duplicates_need_the_same_answer():
+    questions = [
+        make_question(LONG_QUESTION),
+        make_question(LONG_QUESTION.replace("?", " exactly?"), right_answer="Nile"),
+    ]
+
+    report = ingest_questions(questions, workers=1)
+
+    assert not report.near_duplicates
+    assert list(report.kept) == [0, 1]
+
+
+def test_near_duplicate_detection_can_be_disabled():
+    questions = [
+        make_question(LONG_QUESTION),
+        make_question(LONG_QUESTION.replace("?", " exactly?")),
+    ]
+
+    report = ingest_questions(questions, workers=1, threshold=None)
+
+    assert list(report.kept) == [0, 1]
+
+
+def test_invalid_rows_are_reported_and_dropped():
+    questions = [
+        make_question("What is the longest river?"),
+        {k: v for k, v in make_question("No difficulty?").items() if k != "difficulty"},
+        make_question("Bad wrong answers?", wrong_answers="Congo"),
+        make_question("Right answer listed as wrong?", wrong_answers=["Amazon"]),
+        make_question("Boolean difficulty?", difficulty=True),
+        "not a question",
+    ]
+
+    report = ingest_questions(questions, workers=1)
+
+    assert [index for index, _ in report.invalid] == [1, 2, 3, 4, 5]
+    assert list(report.kept) == [0]
+
+
+def test_validate_rejects_too_many_wrong_answers():
+    question = make_question(
+        "Too many?", wrong_answers=[str(i) for i in range(MAX_WRONG_ANSWERS + 1)]
+    )
+    assert validate_question(question)
+
+
+def test_output_is_normalized_and_in_input_order(tmp_path):
+    questions = [
+        make_question("Who wrote &quot;Hamlet&quot;?", right_answer="Shakespeare"),
+        make_question("What  is the\tlongest river?"),
+        make_question("What is the longest river?"),
+    ]
+    report = ingest_questions(questions, workers=1)
+    path = str(tmp_path / "clean.json")
+
+    count = write_questions(path, report.iter_questions(questions))
+
+    with open(path, "r", encoding="utf-8") as f:
+        written = json.load(f)
+    assert count == 2
+    assert [q["question"] for q in written] == [
+        'Who wrote "Hamlet"?',
+        "What is the longest river?",
+    ]
+
+
+def test_write_questions_matches_json_dump_layout(tmp_path, questions_data):
+    path = str(tmp_path / "out.json")
+    write_questions(path, questions_data)
+
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == json.dumps(questions_data, indent=2, ensure_ascii=False)
+
+
+def test_minhash_signature_estimates_similarity():
+    first = minhash_signature(LONG_QUESTION)
+    second = minhash_signature(LONG_QUESTION.replace("?", " exactly?"))
+    unrelated = minhash_signature("Which planet is known as the red planet?")
+
+    assert sum(a == b for a, b in zip(first, second)) / len(first) > 0.7
+    assert sum(a == b for a, b in zip(first, unrelated)) / len(first) < 0.2
+
+
+def test_load_valid_questions_normalizes_and_caps_messages(capsys):
+    questions = [make_question("Who wrote &#039;Hamlet&#039;?")] + [
+        make_question("Missing difficulty?", difficulty=None)
+        for _ in range(MAX_REPORTED_INVALID + 5)
+    ]
+
+    valid = load_valid_questions(questions)
+
+    assert [q["question"] for q in valid] == ["Who wrote 'Hamlet'?"]
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == MAX_REPORTED_INVALID + 1
+    assert lines[-1] == "... and 5 more invalid questions"
+
+
+def test_minhash_signature_is_lanewise_minimum_of_shingle_hashes():
+    words = LONG_QUESTION.lower().replace("?", "").split()
+    shingle_lanes = [
+        ingest._shingle_lanes(f"{a} {b}") for a, b in zip(words, words[1:])
+    ]
+    expected = [
+        min((lanes >> (ingest._LANE_BITS * i)) & 0xFFFFFFFF for lanes in shingle_lanes)
+        for i in range(ingest.DEFAULT_NUM_PERMUTATIONS)
+    ]
+
+    assert minhash_signature(LONG_QUESTION) == expected
@@ -0,0 +1,146 @@
+import random
+
+import pytest
+
+from questions_manager import QuestionsManager
+from skill_model import SkillModel
+
+
+def make_question(text, category="history", difficulty=2):
+    return {
+        "question": text,
+        "right_answer": "Right",
+        "wrong_answers": ["Wrong 1", "Wrong 2", "Wrong 3"],
+        "category": category,
+        "difficulty": difficulty,
+    }
+
+
+class FakeSeen:
+    """Seen-question history with exact membership that counts its lookups."""
+
+    def __init__(self, seen_texts):
+        self.seen_texts = set(seen_texts)
+        self.lookups = 0
+
+    def has_seen(self, question_text):
+        self.lookups += 1
+        return question_text in self.seen_texts
+
+
+@pytest.fixture(autouse=True)
+def seeded_random():
+    random.seed(1234)
+
+
+def test_unseen_questions_are_preferred():
+    questions = [make_question(f"Q{i}") for i in range(4)]
+    seen = FakeSeen(["Q0", "Q1", "Q2"])
+
+    for _ in range(50):
+        manager = QuestionsManager(questions, max_resamples=50)
+        assert manager.get_next_question("history", seen)["question"] == "Q3"
+
+
+def test_seen_questions_are_skipped_while_unseen_remain():
+    questions = [make_question(f"Q{i}") for i in range(6)]
+    seen = FakeSeen(["Q0", "Q1", "Q2"])
+    manager = QuestionsManager(questions, max_resamples=50)
+
+    drawn = [manager.get_next_question("history", seen)["question"] for _ in range(3)]
+
+    assert sorted(drawn) == ["Q3", "Q4", "Q5"]
+
+
+@pytest.mark.parametrize("max_resamples, bucket_size", [(3, 10), (8, 4)])
+def test_resampling_is_bounded_when_everything_was_seen(max_resamples, bucket_size):
+    questions = [make_question(f"Q{i}") for i in range(bucket_size)]
+    seen = FakeSeen(q["question"] for q in questions)
+    manager = QuestionsManager(questions, max_resamples=max_resamples)
+
+    question = manager.get_next_question("history", seen)
+
+    assert question["question"] in seen.seen_texts
+    assert seen.lookups <= min(max_resamples + 1, bucket_size)
+
+
+def test_adaptive_draw_falls_back_to_next_closest_difficulty_with_unseen_questions():
+    questions = [make_question(f"Medium {i}", difficulty=2) for i in range(5)]
+    questions += [make_question("Easy", difficulty=1)]
+    questions += [make_question("Hard", difficulty=3)]
+    seen = FakeSeen([f"Medium {i}" for i in range(5)] + ["Easy"])
+
+    for _ in range(50):
+        manager = QuestionsManager(questions)
+        question = manager.get_next_question("history", seen, SkillModel())
+        assert question["question"] == "Hard"
+
+
+def test_random_draw_falls_back_to_another_difficulty_with_unseen_questions():
+    questions = [make_question(f"Easy {i}", difficulty=1) for i in range(3)]
+    questions += [make_question("Hard", difficulty=3)]
+    seen = FakeSeen(f"Easy {i}" for i in range(3))
+
+    for _ in range(50):
+        manager = QuestionsManager(questions)
+        assert manager.get_next_question("history", seen)["question"] == "Hard"
+
+
+def test_fallback_draws_share_the_resample_budget():
+    questions = [make_question(f"Q{i}", difficulty=1 + i % 3) for i in range(30)]
+    seen = FakeSeen(q["question"] for q in questions)
+    manager = QuestionsManager(questions, max_resamples=4)
+
+    manager.get_next_question("history", seen, SkillModel())
+
+    assert seen.lookups == 5
+
+
+@pytest.mark.parametrize(
+    "difficulties, target, expected",
+    [
+        ([1, 2, 3], 2.0, 2),
+        ([1, 2, 3], 2.4, 2),
+        ([1, 2, 3], 2.6, 3),
+        ([1, 3], 2.0, 1),  # Ties go to the easier difficulty
+        ([1, 2, 3], -0.5, 1),
+        ([1, 2, 3], 3.7, 3),
+        ([2], 0.0, 2),
+    ],
+)
+def test_closest_difficulty(difficulties, target, expected):
+    manager = QuestionsManager(
+        [make_question(f"Q{d}", difficulty=d) for d in difficulties]
+    )
+
+    assert manager._closest_difficulty("history", target) == expected
+
+
+def test_random_difficulty_keeps_every_question_equally_likely():
+    questions = [make_question("Easy", difficulty=1)]
+    questions += [make_question(f"Medium {i}", difficulty=2) for i in range(2)]
+    questions += [make_question(f"Hard {i}", difficulty=3) for i in range(3)]
+    manager = QuestionsManager(questions)
+
+    draws = [manager._random_difficulty("history") for _ in range(6000)]
+
+    for difficulty, count in [(1, 1), (2, 2), (3, 3)]:
+        assert draws.count(difficulty) / 6000 == pytest.approx(count / 6, abs=0.03)
+
+
+def test_used_up_difficulties_and_categories_are_removed():
+    questions = [make_question(f"Easy {i}", difficulty=1) for i in range(2)]
+    questions += [make_question("Hard", difficulty=3)]
+    questions += [make_question("Song", category="music")]
+    manager = QuestionsManager(questions)
+
+    assert manager.get_next_question("history", skill=SkillModel())["difficulty"] == 1
+    assert manager.get_next_question("history", skill=SkillModel())["difficulty"] == 1
+    assert manager.available_difficulties["history"] == [3]
+    assert 1 not in manager.bucket_question_counts["history"]
+    assert manager._random_difficulty("history") == 3
+
+    assert manager.get_next_question("history")["question"] == "Hard"
+    assert manager.get_categories() == ["music"]
+    assert manager.get_next_question("history") is None
+    assert manager.total_available_questions == 1
@@ -0,0 +1,66 @@
+import pytest
+
+from seen_filter import BloomFilter, SeenQuestions, SeenQuestionsStore, question_key
+
+
+def test_bloom_filter_round_trip():
+    bloom = BloomFilter.for_capacity(100, 0.01, 1024)
+    for i in range(50):
+        bloom.add(question_key(f"question {i}"))
+
+    loaded, end = BloomFilter.from_bytes(bloom.to_bytes())
+
+    assert end == len(bloom.to_bytes())
+    assert (loaded.num_bits, loaded.num_hashes) == (bloom.num_bits, bloom.num_hashes)
+    assert (loaded.capacity, loaded.count) == (100, 50)
+    assert loaded.bits == bloom.bits
+    assert all(question_key(f"question {i}") in loaded for i in range(50))
+
+
+def test_bloom_filter_rejects_other_files():
+    data = bytearray(BloomFilter.for_capacity(10).to_bytes())
+    data[:4] = b"XXXX"
+    with pytest.raises(ValueError):
+        BloomFilter.from_bytes(bytes(data))
+
+
+def test_seen_questions_rotate_and_keep_false_positives_bounded():
+    seen = SeenQuestions(BloomFilter.for_capacity(500, 0.01, 4096))
+    for i in range(5000):
+        seen.mark_seen(f"question {i}")
+
+    assert seen.current.count <= 500
+    assert all(seen.has_seen(f"question {i}") for i in range(4500, 5000))
+    false_positives = sum(seen.has_seen(f"other {i}") for i in range(5000))
+    assert false_positives / 5000 < 0.05
+
+
+def test_seen_questions_round_trip_both_generations():
+    seen = SeenQuestions(BloomFilter.for_capacity(20, 0.01, 1024))
+    for i in range(30):
+        seen.mark_seen(f"question {i}")
+    assert seen.previous is not None
+
+    loaded = SeenQuestions.from_bytes(seen.to_bytes())
+
+    assert loaded.current.bits == seen.current.bits
+    assert loaded.previous.bits == seen.previous.bits
+    assert all(loaded.has_seen(f"question {i}") for i in range(10, 30))
+
+
+def test_store_persists_history(tmp_path):
+    store = SeenQuestionsStore(str(tmp_path))
+    store.get("Alice").mark_seen("What is 2 + 2?")
+    store.save()
+
+    reloaded = SeenQuestionsStore(str(tmp_path))
+    assert reloaded.get("Alice").has_seen("What is 2 + 2?")
+    assert not reloaded.get("Bob").has_seen("What is 2 + 2?")
+
+
+def test_store_ignores_unreadable_history(tmp_path):
+    store = SeenQuestionsStore(str(tmp_path))
+    with open(store._path("Alice"), "wb") as f:
+        f.write(b"garbage")
+
+    assert not store.get("Alice").has_seen("What is 2 + 2?")
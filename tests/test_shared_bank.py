@@ -0,0 +1,118 @@
+import json
+import os
+import uuid
+from multiprocessing import shared_memory
+
+import pytest
+
+from questions_manager import QuestionsManager
+from shared_bank import (
+    FORMAT_VERSION,
+    MAX_WRONG_ANSWERS,
+    SharedQuestionBank,
+    encode_question_bank,
+)
+
+QUESTIONS_FILE = os.path.join(os.path.dirname(__file__), "..", "questions.json")
+
+
+def _unique_name():
+    return f"trivia_test_{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def questions_data():
+    with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def published(questions_data):
+    bank = SharedQuestionBank.publish(questions_data, _unique_name())
+    yield bank
+    bank.unlink()
+
+
+def _key(question):
+    return question["question"]
+
+
+def test_round_trip(questions_data, published):
+    attached = SharedQuestionBank.attach(published.name)
+    try:
+        decoded = [attached[i] for i in range(len(attached))]
+    finally:
+        attached.close()
+
+    assert len(decoded) == len(questions_data)
+    assert sorted(decoded, key=_key) == sorted(questions_data, key=_key)
+
+
+def test_round_trip_non_ascii_text():
+    question = {
+        "question": "Qu’est-ce que « ça » ? 日本",
+        "right_answer": "Émile",
+        "wrong_answers": ["Zoë", "", "Ñandú"],
+        "category": "café",
+        "difficulty": 3,
+    }
+    bank = SharedQuestionBank.publish([question], _unique_name())
+    try:
+        assert bank[0] == question
+    finally:
+        bank.unlink()
+
+
+def test_bucket_indices_match_questions(published):
+    for category, buckets in published.bucket_indices().items():
+        for difficulty, indices in buckets.items():
+            for index in indices:
+                question = published[index]
+                assert question["category"] == category
+                assert question["difficulty"] == difficulty
+
+
+def test_questions_manager_draws_every_question_once(questions_data, published):
+    manager = QuestionsManager(published, bucket_indices=published.bucket_indices())
+    drawn = []
+    while manager.total_available_questions:
+        drawn.append(manager.get_next_question()["question"])
+
+    assert sorted(drawn) == sorted(q["question"] for q in questions_data)
+
+
+def test_index_out_of_range(published):
+    with pytest.raises(IndexError):
+        published[len(published)]
+
+
+def test_attach_rejects_other_blocks():
+    shm = shared_memory.SharedMemory(create=True, size=64)
+    try:
+        with pytest.raises(ValueError):
+            SharedQuestionBank(shm)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_attach_rejects_other_format_versions(questions_data):
+    data = bytearray(encode_question_bank(questions_data))
+    data[4:8] = (FORMAT_VERSION + 1).to_bytes(4, "little")
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    shm.buf[: len(data)] = data
+    try:
+        with pytest.raises(ValueError, match="format version"):
+            SharedQuestionBank(shm)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_encode_rejects_too_many_wrong_answers(questions_data):
+    question = dict(
+        questions_data[0],
+        wrong_answers=[str(i) for i in range(MAX_WRONG_ANSWERS + 1)],
+    )
+    with pytest.raises(ValueError, match=str(MAX_WRONG_ANSWERS)):
+        encode_question_bank([question])
@@ -0,0 +1,80 @@
+import pytest
+
+from config import DEFAULT_SKILL_RATING, SKILL_K_FACTOR
+from skill_model import SkillModel, SkillStore, difficulty_rating, expected_success
+
+
+def test_new_player_has_default_rating():
+    assert SkillModel().get_rating("history") == DEFAULT_SKILL_RATING
+
+
+def test_difficulty_rating_is_centered_on_medium():
+    assert difficulty_rating(2) == DEFAULT_SKILL_RATING
+    assert difficulty_rating(1) < difficulty_rating(2) < difficulty_rating(3)
+
+
+def test_expected_success_of_equal_ratings_is_even():
+    assert expected_success(1500, 1500) == pytest.approx(0.5)
+    assert expected_success(1700, 1500) > 0.5
+
+
+@pytest.mark.parametrize("correct, change", [(True, 16), (False, -16)])
+def test_update_after_medium_question(correct, change):
+    skill = SkillModel()
+    skill.update("history", 2, correct)
+
+    assert skill.get_rating("history") == pytest.approx(DEFAULT_SKILL_RATING + change)
+    assert skill.get_rating("music") == DEFAULT_SKILL_RATING
+
+
+def test_update_rewards_surprising_answers_more():
+    hard = SkillModel()
+    hard.update("history", 3, True)
+    easy = SkillModel()
+    easy.update("history", 1, True)
+
+    hard_gain = hard.get_rating("history") - DEFAULT_SKILL_RATING
+    easy_gain = easy.get_rating("history") - DEFAULT_SKILL_RATING
+    assert easy_gain < SKILL_K_FACTOR / 2 < hard_gain < SKILL_K_FACTOR
+    expected = expected_success(DEFAULT_SKILL_RATING, difficulty_rating(3))
+    assert hard_gain == pytest.approx(SKILL_K_FACTOR * (1 - expected))
+
+
+def test_default_target_difficulty_is_medium():
+    # At a 0.6 target success rate a new player should get slightly easier
+    # than medium questions, which rounds to medium.
+    target = SkillModel().target_difficulty("history")
+
+    assert target == pytest.approx(1.648, abs=0.001)
+    assert round(target) == 2
+
+
+def test_target_difficulty_follows_rating():
+    skill = SkillModel()
+    skill.ratings["history"] = DEFAULT_SKILL_RATING + 400
+    skill.ratings["music"] = DEFAULT_SKILL_RATING - 400
+
+    assert skill.target_difficulty("history") == pytest.approx(3.648, abs=0.001)
+    assert skill.target_difficulty("music") == pytest.approx(-0.352, abs=0.001)
+
+
+def test_store_persists_ratings(tmp_path):
+    store = SkillStore(str(tmp_path))
+    store.get("Alice").update("history", 3, True)
+    store.save()
+
+    reloaded = SkillStore(str(tmp_path))
+    assert reloaded.get("Alice").ratings == store.get("Alice").ratings
+    assert reloaded.get("Alice").get_rating("history") > DEFAULT_SKILL_RATING
+    assert reloaded.get("Bob").ratings == {}
+
+
+@pytest.mark.parametrize(
+    "contents", ["garbage", "[]", '{"ratings": []}', '{"ratings": {"history": NaN}}']
+)
+def test_store_ignores_unreadable_ratings(tmp_path, contents):
+    store = SkillStore(str(tmp_path))
+    with open(store._path("Alice"), "w", encoding="utf-8") as f:
+        f.write(contents)
+
+    assert store.get("Alice").get_rating("history") == DEFAULT_SKILL_RATING
@@ -7,15 +7,39 @@ from display import (
 )
 from player import Players
 from questions_manager import QuestionsManager
+from seen_filter import SeenQuestionsStore
+from skill_model import SkillStore
 import time
 
 
 class Trivia:
-    def __init__(self, players: Players, questions: QuestionsManager):
+    def __init__(
+        self,
+        players: Players,
+        questions: QuestionsManager,
+        seen_store: SeenQuestionsStore = None,
+        adaptive: bool = True,
+        skill_store: SkillStore = None,
+    ):
         self.questions = questions
         self.players: Players = players
+        self.seen_store = seen_store
+        self.adaptive = adaptive
+        self.skill_store = skill_store
+        if skill_store:
+            for player in players:
+                player.skill = skill_store.get(player.name)
 
     def run(self):
+        try:
+            self._run()
+        finally:
+            if self.seen_store:
+                self.seen_store.save()
+            if self.skill_store:
+                self.skill_store.save()
+
+    def _run(self):
         print(f"\nWelcome to Trivia!")
 
         turn_index = 0
@@ -44,11 +68,15 @@ class Trivia:
                 display_playing_player_bar(
                     self.players, current_player_index=player.idx
                 )
-                question = self.questions.get_next_question(category)
+                seen = self.seen_store.get(player.name) if self.seen_store else None
+                skill = player.skill if self.adaptive else None
+                question = self.questions.get_next_question(category, seen, skill)
                 if not question:
                     print("No more questions available. Ending game.")
                     return
             player.update_last_question(question["question"])
+            if self.seen_store:
+                self.seen_store.get(player.name).mark_seen(question["question"])
             print(f"\nTurn {turn_index} for player-{player.name}:\n")
             answer = display_question_and_get_answer(player, question)
 
@@ -71,7 +99,9 @@ class Trivia:
                     get_new_question = False
                 continue
 
-            if answer == question["correct_answer_index"]:
+            correct = answer == question["correct_answer_index"]
+            player.skill.update(question["category"], question["difficulty"], correct)
+            if correct:
                 score = question["difficulty"] * 10
                 player.score += score
                 print(f"Correct! {player.name} won {score} points.")
@@ -92,11 +122,19 @@ class Trivia:
         display_game_over(self.players)
 
 
-def start(player_names, questions: QuestionsManager):
+def start(
+    player_names,
+    questions: QuestionsManager,
+    seen_store: SeenQuestionsStore = None,
+    adaptive: bool = True,
+    skill_store: SkillStore = None,
+):
 
     # Validate minimum number of players
     if len(player_names) < 2:
         raise ValueError("Game requires at least 2 players")
 
-    trivia = Trivia(Players(player_names), questions)
+    trivia = Trivia(
+        Players(player_names), questions, seen_store, adaptive, skill_store
+    )
     trivia.run()